@@ -192,9 +192,19 @@ class TestResourceSpectrum(unittest.TestCase):
         lambda_w = 200 * np.ones_like(D)
 
         wave.graphics.plot_chakrabarti(H, lambda_w, D)
+        ax = plt.gca()
+        assert_allclose(ax.get_xlim(), (0.01, 10))
+        assert_allclose(ax.get_ylim(), (0.01, 50))
         plt.savefig(filename)
         
         self.assertTrue(isfile(filename))
+        
+        # lambda_w >= 1000 autoscales to the region boundaries
+        wave.graphics.plot_chakrabarti(H, 1000 * np.ones_like(D), D)
+        ax = plt.gca()
+        assert_allclose(ax.get_xlim(), (0.01, 10))
+        assert_allclose(ax.get_ylim(), (0.014*np.pi, 14*np.pi))
+        plt.close('all')
 
     def test_plot_chakrabarti_pd(self):            
         filename = abspath(join(testdir, 'wave_plot_chakrabarti_pd.png'))
@@ -606,12 +616,15 @@ class TestResourceContours(unittest.TestCase):
         
         contour_label = [f'{year}-year Contour' for year in time_R]
         plt.figure()
-        wave.graphics.plot_environmental_contour(Te, Hm0,
+        ax = wave.graphics.plot_environmental_contour(Te, Hm0,
                                                  Te_contour, Hm0_contour,
                                                  data_label='NDBC 46022',
                                                  contour_label=contour_label,
                                                  x_label = 'Te [s]',
                                                  y_label = 'Hm0 [m]')
+        legend_texts = [text.get_text() for text in ax.get_legend().get_texts()]
+        self.assertIsInstance(ax, plt.Axes)
+        self.assertEqual(legend_texts, contour_label + ['NDBC 46022'])
         plt.savefig(filename, format='png')
         plt.close()
         
@@ -1207,6 +1220,59 @@ class TestIOcdip(unittest.TestCase):
         
         self.assertTrue(isfile(filename))  
 
+    def test_plot_compendium_reuse_figure(self):
+        index = pd.date_range(start='1/1/2011', periods=30*48, freq='30min')
+        Hs = pd.Series(np.random.uniform(0.5, 4, len(index)), index=index)
+        Tp = pd.Series(np.random.uniform(5, 20, len(index)), index=index)
+        Dp = pd.Series(np.random.uniform(0, 360, len(index)), index=index)
+        
+        fig = plt.figure()
+        old_ax = fig.add_subplot(111)
+        plt.figure()
+        
+        f = wave.graphics.plot_compendium(Hs, Tp, Dp, buoy_title='Test buoy',
+                                          fig=fig)
+        
+        self.assertIs(f, fig)
+        self.assertNotIn(old_ax, fig.axes)
+        self.assertIn('Test buoy', [text.get_text() for text in fig.texts])
+        plt.close('all')
+        
+    def test_plot_boxplot_reuse_figure(self):
+        index = pd.date_range(start='1/1/2011', periods=365*48, freq='30min')
+        Hs = pd.Series(np.random.uniform(0.5, 4, len(index)), index=index)
+        
+        fig = plt.figure()
+        old_ax = fig.add_subplot(111)
+        plt.figure()
+        
+        f = wave.graphics.plot_boxplot(Hs, buoy_title='Test buoy', fig=fig)
+        
+        self.assertIs(f, fig)
+        self.assertNotIn(old_ax, fig.axes)
+        self.assertIn('Test buoy', [text.get_text() for text in fig.texts])
+        plt.close('all')
+
+    def test_plot_boxplot_month_labels(self):
+        # Jul-Feb crosses the new year and October is missing
+        index = pd.date_range(start='7/1/2011', end='2/28/2012', freq='h')
+        Hs = pd.Series(np.random.uniform(0.5, 4, len(index)), index=index)
+        Hs = Hs[Hs.index.month != 10]
+        
+        fig = wave.graphics.plot_boxplot(Hs)
+        fig.canvas.draw()
+        bp, newax = fig.axes[0], fig.axes[1]
+        
+        months = [1, 2, 7, 8, 9, 11, 12]
+        monthlengths = Hs.groupby(Hs.index.month).count()
+        self.assertEqual(list(bp.get_xticks()), months)
+        self.assertEqual([label.get_text() for label in bp.get_xticklabels()],
+                         ['Jan', 'Feb', 'Jul', 'Aug', 'Sep', 'Nov', 'Dec'])
+        self.assertEqual(list(newax.get_xticks()), months)
+        self.assertEqual([label.get_text() for label in newax.get_xticklabels()],
+                         [str(count) for count in monthlengths[months]])
+        plt.close('all')
+
 class TestPlotResouceCharacterizations(unittest.TestCase):
 
     @classmethod
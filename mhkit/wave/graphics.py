@@ -8,6 +8,8 @@ from mhkit.river.graphics import _xy_plot
 from mhkit.river.resource import exceedance_probability
 import calendar
 from matplotlib import gridspec
+from matplotlib.collections import LineCollection
+from matplotlib.dates import DayLocator, DateFormatter
 from matplotlib import pylab
 import datetime
 
@@ -30,9 +32,13 @@ def plot_spectrum(S, ax=None):
     """
     assert isinstance(S, pd.DataFrame), 'S must be of type pd.DataFrame'
 
-    f = S.index
+    # Convert to angular frequency on the raw arrays to avoid building a
+    # new indexed DataFrame
+    two_pi = 2*np.pi
+    omega = np.multiply(S.index.to_numpy(), two_pi)
+    S_omega = np.multiply(S.to_numpy(), 1/two_pi)
 
-    ax = _xy_plot(f*2*np.pi, S/(2*np.pi), fmt='-', xlabel='omega [rad/s]',
+    ax = _xy_plot(omega, S_omega, fmt='-', xlabel='omega [rad/s]',
              ylabel='Spectral density [m$^2$s/rad]', ax=ax)
 
 
@@ -95,7 +101,16 @@ def plot_matrix(M, xlabel='Te', ylabel='Hm0', zlabel=None, show_values=True,
         plt.figure()
         ax = plt.gca()
 
-    im = ax.imshow(M, origin='lower', aspect='auto')
+    # Set x and y ticks
+    ax.set_xticks(np.arange(len(M.columns)))
+    ax.set_yticks(np.arange(len(M.index)))
+    ax.set_xticklabels(M.columns)
+    ax.set_yticklabels(M.index)
+
+    # Convert once to a contiguous float array so imshow does not copy it,
+    # and mask NaNs so they are not colormapped
+    values = np.ascontiguousarray(M.to_numpy(dtype=float))
+    im = ax.imshow(np.ma.masked_invalid(values), origin='lower', aspect='auto')
 
     # Add colorbar
     cbar = plt.colorbar(im)
@@ -108,20 +123,50 @@ def plot_matrix(M, xlabel='Te', ylabel='Hm0', zlabel=None, show_values=True,
 
     # Show values in the plot
     if show_values:
-        for i, col in enumerate(M.columns):
-            for j, index in enumerate(M.index):
-                if not np.isnan(M.loc[index,col]):
-                    ax.text(i, j, format(M.loc[index,col], '.2f'), ha="center", va="center")
-
-    # Reset x and y ticks
-    ax.set_xticks(np.arange(len(M.columns)))
-    ax.set_yticks(np.arange(len(M.index)))
-    ax.set_xticklabels(M.columns)
-    ax.set_yticklabels(M.index)
+        n_rows, n_cols = values.shape
+        text = ax.text
+        for j in range(n_rows):
+            row = values[j]
+            for i in range(n_cols):
+                value = row[i]
+                # value != value only for NaN
+                if value == value:
+                    text(i, j, format(value, '.2f'), ha="center", va="center")
 
     return ax
 
 
+# Region labels for plot_chakrabarti as (x, y, text, vertical alignment)
+_CHAKRABARTI_REGION_LABELS = (
+    (1, 7, 'wave\nbreaking\n$H/\\lambda_w > 0.14$', 'center'),
+    (0.0125, 30, 'drag', 'top'),
+    (0.02, 7, 'inertia \n& drag', 'center'),
+    (8e-2, 0.7, 'large\ninertia', 'center'),
+    (8e-2, 6e-2, 'all\ninertia', 'center'),
+    (2, 6e-2, 'diffraction', 'center'),
+)
+_CHAKRABARTI_TEXT_KWARGS = dict(ha='center', fontstyle='italic',
+                                fontsize='small', clip_on=True)
+
+
+def _breaking_limit(x):
+    """
+    Deep water breaking limit (H/lambda_w = 0.14) on the Chakrabarti
+    diagram. The limit is symmetric in the KC and diffraction parameters.
+
+    Parameters
+    ----------
+    x: float or numpy array
+        KC or diffraction parameter
+
+    Returns
+    -------
+    y: float or numpy array
+        The other parameter on the breaking limit
+    """
+    return 0.14 * np.pi / x
+
+
 def plot_chakrabarti(H, lambda_w, D, ax=None):
     """
     Plots, in the style of Chakrabart (2005), relative importance of viscous,
@@ -163,8 +208,8 @@ def plot_chakrabarti(H, lambda_w, D, ax=None):
     >>> D = np.linspace(5,15,5)
     >>> H = 8*np.ones_like(D)
     >>> lambda_w = 200*np.ones_like(D)
-    >>> df = pd.DataFrame([H.flatten(),lambda_w.flatten(),D.flatten()], \
-                              index=['H','lambda_w','D']).transpose()
+    >>> df = pd.DataFrame({'H': H.flatten(), 'lambda_w': lambda_w.flatten(),
+    ...                    'D': D.flatten()})
     >>> wave.graphics.plot_chakrabarti(df.H, df.lambda_w, df.D)
     """
     assert isinstance(H, (np.ndarray, float, int, np.int64,pd.Series)), \
@@ -174,32 +219,11 @@ def plot_chakrabarti(H, lambda_w, D, ax=None):
     assert isinstance(D, (np.ndarray, float, int, np.int64,pd.Series)), \
            'D must be a real numeric type'
 
-    if any([(isinstance(H, np.ndarray) or isinstance(H, pd.Series)),        \
-            (isinstance(lambda_w, np.ndarray) or isinstance(H, pd.Series)), \
-            (isinstance(D, np.ndarray) or isinstance(H, pd.Series))\
-           ]):
-        errMsg = 'D, H, and lambda_w must be same shape'
-        n_H = H.squeeze().shape
-        n_lambda_w = lambda_w.squeeze().shape
-        n_D = D.squeeze().shape
-        assert n_H == n_lambda_w and n_H == n_D, errMsg
-
-        if isinstance(H, np.ndarray):
-            mvals = pd.DataFrame(H.reshape(len(H),1), columns=['H'])
-            mvals['lambda_w'] = lambda_w
-            mvals['D'] = D
-        elif isinstance(H, pd.Series):
-            mvals = pd.DataFrame(H)
-            mvals['lambda_w'] = lambda_w
-            mvals['D'] = D
-
-    else:
-        H = np.array([H])
-        lambda_w = np.array([lambda_w])
-        D = np.array([D])
-        mvals = pd.DataFrame(H.reshape(len(H),1), columns=['H'])
-        mvals['lambda_w'] = lambda_w
-        mvals['D'] = D
+    H = np.atleast_1d(np.asarray(H).squeeze())
+    lambda_w = np.atleast_1d(np.asarray(lambda_w).squeeze())
+    D = np.atleast_1d(np.asarray(D).squeeze())
+    assert H.shape == lambda_w.shape == D.shape, \
+           'D, H, and lambda_w must be same shape'
 
     if ax is None:
         plt.figure()
@@ -208,18 +232,26 @@ def plot_chakrabarti(H, lambda_w, D, ax=None):
     ax.set_xscale('log')
     ax.set_yscale('log')
 
-    for index, row in mvals.iterrows():
-        H = row.H
-        D = row.D
-        lambda_w = row.lambda_w
-        
-        KC = H / D
-        Diffraction = np.pi*D / lambda_w
-        label = f'$H$ = {H:g}, $\lambda_w$ = {lambda_w:g}, $D$ = {D:g}'
-        ax.plot(Diffraction, KC, 'o', label=label)
-   
-    if np.any(KC>=10 or KC<=.02) or np.any(Diffraction>=50) or \
-        np.any(lambda_w >= 1000) :
+    KC = H / D
+    Diffraction = np.pi*D / lambda_w
+
+    # Legend labels are only shown for more than one point
+    if len(KC) > 1:
+        labels = [f'$H$ = {h:g}, $\\lambda_w$ = {lw:g}, $D$ = {d:g}'
+                  for h, lw, d in zip(H, lambda_w, D)]
+    else:
+        labels = None
+
+    if labels:
+        # One Line2D per point so that each gets its own legend entry
+        points = ax.plot(Diffraction[np.newaxis,:], KC[np.newaxis,:], 'o')
+        for point, label in zip(points, labels):
+            point.set_label(label)
+    else:
+        ax.scatter(Diffraction, KC)
+
+    if KC.max() >= 10 or KC.min() <= .02 or Diffraction.max() >= 50 or \
+        lambda_w.max() >= 1000:
         ax.autoscale(enable=True, axis='both', tight=True)  
     else:
         ax.set_xlim((0.01, 10))
@@ -231,64 +263,45 @@ def plot_chakrabarti(H, lambda_w, D, ax=None):
 
     # deep water breaking limit (H/lambda_w = 0.14)
     x = np.logspace(1,np.log10(graphScale[0]), 2)
-    y_breaking = 0.14 * np.pi / x
-    ax.plot(x, y_breaking, 'k-')
+    y_breaking = _breaking_limit(x)
+    boundaries = [list(zip(x, y_breaking))]
+    # All region boundaries are drawn as a single LineCollection below, so
+    # update the limits here as the individual lines would have done
+    ax.update_datalim(boundaries[-1])
+    ax.autoscale_view()
     graphScale = list(ax.get_xlim())
-    
-    ax.text(1, 7, 
-            'wave\nbreaking\n$H/\lambda_w > 0.14$', 
-            ha='center', va='center', fontstyle='italic', 
-            fontsize='small',clip_on='True')
 
     # upper bound of low drag region
     ldv = 20
-    y_small_drag = 20*np.ones_like(graphScale)
-    graphScale[1] = 0.14 * np.pi / ldv
-    ax.plot(graphScale, y_small_drag,'k--')
-    ax.text(0.0125, 30, 
-            'drag', 
-            ha='center', va='top', fontstyle='italic',
-            fontsize='small',clip_on='True')
-            
+    graphScale[1] = _breaking_limit(ldv)
+    boundaries.append([(graphScale[0], ldv), (graphScale[1], ldv)])
+
     # upper bound of small drag region
     sdv = 1.5
-    y_small_drag = sdv*np.ones_like(graphScale)
-    graphScale[1] = 0.14 * np.pi / sdv
-    ax.plot(graphScale, y_small_drag,'k--')
-    ax.text(0.02, 7, 
-            'inertia \n& drag', 
-            ha='center', va='center', fontstyle='italic', 
-            fontsize='small',clip_on='True')
+    graphScale[1] = _breaking_limit(sdv)
+    boundaries.append([(graphScale[0], sdv), (graphScale[1], sdv)])
 
     # upper bound of negligible drag region
     ndv = 0.25
-    graphScale[1] = 0.14 * np.pi / ndv
-    y_small_drag = ndv*np.ones_like(graphScale)
-    ax.plot(graphScale, y_small_drag,'k--')
-    ax.text(8e-2, 0.7, 
-            'large\ninertia', 
-            ha='center', va='center', fontstyle='italic', 
-            fontsize='small',clip_on='True')
-
-
-    ax.text(8e-2, 6e-2, 
-            'all\ninertia', 
-            ha='center', va='center', fontstyle='italic', 
-            fontsize='small', clip_on='True')
+    graphScale[1] = _breaking_limit(ndv)
+    boundaries.append([(graphScale[0], ndv), (graphScale[1], ndv)])
 
     # left bound of diffraction region
     drv = 0.5
+    ax.update_datalim(np.concatenate(boundaries[1:]))
+    ax.autoscale_view()
     graphScale = list(ax.get_ylim())
-    graphScale[1] = 0.14 * np.pi / drv
-    x_diff_reg = drv*np.ones_like(graphScale)
-    ax.plot(x_diff_reg, graphScale, 'k--')
-    ax.text(2, 6e-2, 
-            'diffraction', 
-            ha='center', va='center', fontstyle='italic',
-            fontsize='small',clip_on='True')
+    graphScale[1] = _breaking_limit(drv)
+    boundaries.append([(drv, graphScale[0]), (drv, graphScale[1])])
 
+    for x_text, y_text, label, va in _CHAKRABARTI_REGION_LABELS:
+        ax.text(x_text, y_text, label, va=va, **_CHAKRABARTI_TEXT_KWARGS)
 
-    if index > 0:
+    ax.add_collection(LineCollection(boundaries, colors='k',
+                                     linestyles=['-','--','--','--','--']))
+    ax.autoscale_view()
+
+    if labels:
         ax.legend(fontsize='xx-small', ncol=2)
 
     ax.set_xlabel('Diffraction parameter, $\\frac{\\pi D}{\\lambda_w}$')
@@ -360,18 +373,18 @@ def plot_environmental_contour(x1, x2, x1_contour, x2_contour, **kwargs):
         assert  N_c_labels == N_contours, ('If specified, the '
              'number of contour lables must be equal to number the '
             f'number of contour years. Got {N_c_labels} and {N_contours}')   
-    else:
-        contour_label = [None] * N_contours
     
-    for i in range(N_contours):       
-        ax = _xy_plot(x1_contour[:,i], x2_contour[:,i],'-', 
-                      label=contour_label[i], ax=ax)
+    # Plot every contour column in a single call, one line per column
+    ax = _xy_plot(x1_contour, x2_contour, '-', ax=ax)
+    if contour_label is not None:
+        contour_lines = ax.get_lines()[-N_contours:]
+        for line, label in zip(contour_lines, contour_label):
+            line.set_label(label)
             
-    ax = plt.plot(x1, x2, 'bo', alpha=0.1, 
-                  label=data_label) 
-    plt.legend(loc='lower right')
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
+    ax.plot(x1, x2, 'bo', alpha=0.1, label=data_label)
+    ax.legend(loc='lower right')
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
     plt.tight_layout()
     return ax
     
@@ -519,7 +532,7 @@ def monthly_cumulative_distribution(J):
     plt.legend()
     return ax
 
-def plot_compendium(Hs, Tp, Dp, buoy_title=None, ax=None):
+def plot_compendium(Hs, Tp, Dp, buoy_title=None, ax=None, fig=None):
     """
     Create subplots showing: Significant Wave Height (Hs), Peak Period (Tp), 
     and Direction (Dp) using OPeNDAP service from CDIP THREDDS Server.
@@ -539,7 +552,11 @@ def plot_compendium(Hs, Tp, Dp, buoy_title=None, ax=None):
     buoy_title: string (optional)
         Buoy title from the CDIP THREDDS Server
     ax : matplotlib axes object (optional)
-        Axes for plotting.  If None, then a new figure is created.
+        Not used, the compendium always creates its own three subplots.
+        Use fig to plot into an existing figure.
+    fig : matplotlib figure object (optional)
+        Figure to clear and reuse for plotting. If None, then a new figure
+        is created.
     Returns
     -------
     ax : matplotlib pyplot axes
@@ -550,11 +567,16 @@ def plot_compendium(Hs, Tp, Dp, buoy_title=None, ax=None):
     assert isinstance(Dp, pd.Series), 'Dp must be of type pd.Series'
     assert isinstance(buoy_title, (str, type(None))), 'buoy_title must be of type string'
 
-    f, (pHs, pTp, pDp) = plt.subplots(3, 1, sharex=True, figsize=(15,10)) 
+    if fig is None:
+        f, (pHs, pTp, pDp) = plt.subplots(3, 1, sharex=True, figsize=(15,10))
+    else:
+        f = fig
+        f.clear()
+        pHs, pTp, pDp = f.subplots(3, 1, sharex=True)
     
     pHs.plot(Hs.index,Hs,'b')
     pTp.plot(Tp.index,Tp,'b')
-    pDp.scatter(Dp.index,Dp,color='blue',s=5) 
+    pDp.scatter(Dp.index,Dp,color='blue',s=5,linewidths=0,rasterized=True)
     
     pHs.tick_params(axis='x', which='major', labelsize=12, top='off')
     pHs.set_ylim(0,8)
@@ -581,10 +603,10 @@ def plot_compendium(Hs, Tp, Dp, buoy_title=None, ax=None):
     
     # Set x-axis tick interval to every 5 days
     degrees = 70    
-    days = matplotlib.dates.DayLocator(interval=5) 
-    daysFmt = matplotlib.dates.DateFormatter('%Y-%m-%d')
-    plt.gca().xaxis.set_major_locator(days)
-    plt.gca().xaxis.set_major_formatter(daysFmt)
+    days = DayLocator(interval=5)
+    daysFmt = DateFormatter('%Y-%m-%d')
+    pDp.xaxis.set_major_locator(days)
+    pDp.xaxis.set_major_formatter(daysFmt)
     plt.setp( pDp.xaxis.get_majorticklabels(), rotation=degrees )
 
     # Set Titles
@@ -592,16 +614,16 @@ def plot_compendium(Hs, Tp, Dp, buoy_title=None, ax=None):
     year_start = Hs.index.year[0]
     month_name_end = Hs.index.month_name()[-1][:3]
     year_end = Hs.index.year[-1]
-    plt.suptitle(buoy_title, fontsize=30) 
+    f.suptitle(buoy_title, fontsize=30)
     
-    plt.title(f'{Hs.index[0].date()} to {Hs.index[-1].date()}', fontsize=20)
+    pHs2.set_title(f'{Hs.index[0].date()} to {Hs.index[-1].date()}', fontsize=20)
 
     ax = f
 
     return ax
 
 
-def plot_boxplot(Hs, buoy_title=None):
+def plot_boxplot(Hs, buoy_title=None, fig=None):
     """
     Create plot of monthly-averaged boxes of Significant Wave Height (Hs)
     data.
@@ -615,8 +637,9 @@ def plot_boxplot(Hs, buoy_title=None):
         Spectral density [m^2/Hz] indexed frequency [Hz]
     buoy_title: string (optional)
         Buoy title from the CDIP THREDDS Server
-    ax : matplotlib axes object (optional)
-        Axes for plotting.  If None, then a new figure is created.
+    fig : matplotlib figure object (optional)
+        Figure to clear and reuse for plotting. If None, then a new figure
+        is created.
     Returns
     ---------
     ax : matplotlib pyplot axes
@@ -624,12 +647,24 @@ def plot_boxplot(Hs, buoy_title=None):
     assert isinstance(Hs, pd.Series), 'Hs must be of type pd.Series'
     assert isinstance(buoy_title, (str, type(None))), 'buoy_title must be of type string'
    
-    months = Hs.index.month
-    means = Hs.groupby(months).mean()
-    monthlengths = Hs.groupby(months).count()
-    
-    fig = plt.figure(figsize=(10,12)) 
-    gs = gridspec.GridSpec(2,1, height_ratios=[4,1]) 
+    # Missing values would otherwise propagate into the box statistics
+    Hs = Hs.dropna()
+    # Derive all month information from a single pass over the index
+    months = Hs.index.month.to_numpy()
+    stats = Hs.groupby(months, sort=True).agg(['mean', 'count'])
+    means = stats['mean']
+    monthlengths = stats['count']
+
+    # Split the values into one array per month, in month order
+    order = np.argsort(months, kind='stable')
+    month_splits = np.flatnonzero(np.diff(months[order])) + 1
+    month_values = np.split(Hs.to_numpy()[order], month_splits)
+
+    if fig is None:
+        fig = plt.figure(figsize=(10,12))
+    else:
+        fig.clear()
+    gs = gridspec.GridSpec(2,1, height_ratios=[4,1], figure=fig)
     
     boxprops = dict(color='k')
     whiskerprops = dict(linestyle='--', color='k')
@@ -637,18 +672,20 @@ def plot_boxplot(Hs, buoy_title=None):
     medianprops = dict(linewidth=2.5,color='firebrick')
     meanprops = dict(linewidth=2.5, marker='_',  markersize=25)
     
-    bp = plt.subplot(gs[0,:])    
-    
-    Hs_months = Hs.to_frame().groupby(months)
-    bp = Hs_months.boxplot(subplots=False, boxprops=boxprops,
+    bp = fig.add_subplot(gs[0,:])
+
+    bp.boxplot(month_values, positions=means.index, boxprops=boxprops,
         whiskerprops=whiskerprops, flierprops=flierprops,
         medianprops=medianprops, showmeans=True, meanprops=meanprops)
-    
+    # Axes.boxplot does not turn on the grid like pandas' boxplot does
+    bp.grid(True)
+
     # Add values of monthly means as text
-    for i, mean in enumerate(means):
-        bp.annotate(np.round(mean,2), (means.index[i],mean),fontsize=12,
-                    horizontalalignment='center',verticalalignment='bottom',
-                    color='g')
+    annotate = bp.annotate
+    for month, mean in zip(means.index.to_numpy(), means.round(2).to_numpy()):
+        annotate(mean, (month, mean), fontsize=12,
+                 horizontalalignment='center', verticalalignment='bottom',
+                 color='g')
 
     #Create a second row of x-axis labels for top subplot
     newax = bp.twiny()
@@ -656,25 +693,23 @@ def plot_boxplot(Hs, buoy_title=None):
     newax.set_xlim(bp.get_xlim())
     newax.xaxis.set_ticks_position('top')
     newax.xaxis.set_label_position('top')
-    newax.set_xticks(np.arange(1,13,1)) 
+    newax.set_xticks(means.index)
     newax.set_xticklabels(monthlengths,fontsize=10)
                        
 
     # Sample 'legend' boxplot, to go underneath actual boxplot
     bp_sample2 = np.random.normal(2.5,0.5,500)        
-    bp2 = plt.subplot(gs[1,:])
+    bp2 = fig.add_subplot(gs[1,:])
     meanprops = dict(linewidth=2.5, marker='|',  markersize=25)
     bp2_example = bp2.boxplot(bp_sample2,vert=False,flierprops=flierprops, 
                         medianprops=medianprops) 
     sample_mean=2.3
     bp2.scatter(sample_mean,1,marker="|",color='g',linewidths=1.0,s=200)
     
-    for line in bp2_example['medians']:
-        xm, ym = line.get_xydata()[0] 
-    for line in bp2_example['boxes']:
-        xb, yb = line.get_xydata()[0] 
-    for line in bp2_example['whiskers']:
-        xw, yw = line.get_xydata()[0] 
+    # Read the first vertex of the last line of each kind (upper whisker)
+    xm, ym = bp2_example['medians'][-1].get_path().vertices[0]
+    xb, yb = bp2_example['boxes'][-1].get_path().vertices[0]
+    xw, yw = bp2_example['whiskers'][-1].get_path().vertices[0]
     
     bp2.annotate("Median",[xm-0.1,ym-0.3*ym],fontsize=10,color='firebrick')
     bp2.annotate("Mean",[sample_mean-0.1,0.65],fontsize=10,color='g')
@@ -683,12 +718,12 @@ def plot_boxplot(Hs, buoy_title=None):
     bp2.annotate("Outliers",[xw+0.3*xw,yw-0.3*yw],fontsize=10,color='r')
        
     if buoy_title:
-        plt.suptitle(buoy_title, fontsize=30, y=0.97)
+        fig.suptitle(buoy_title, fontsize=30, y=0.97)
     bp.set_title("Significant Wave Height by Month", fontsize=20, y=1.01)
     bp2.set_title("Sample Boxplot", fontsize=10, y=1.02)
     
     # Set axes labels and ticks    
-    months_text = [ m[:3] for m in Hs.index.month_name().unique()]
+    months_text = [calendar.month_abbr[m] for m in means.index]
     bp.set_xticklabels(months_text,fontsize=12)
     bp.set_ylabel('Significant Wave Height, Hs (m)', fontsize=14)
     bp.tick_params(axis='y', which='major', labelsize=12, right='off')